@@ -99,6 +99,33 @@ def memory_database_example():
     # Note: Data will be lost when the program ends
 
 
+def shared_memory_database_example():
+    """Demonstrate several agents sharing one in-memory database."""
+    
+    # A plain ":memory:" database is private to its connection. With
+    # shared_memory=True every manager in the process opens the same
+    # shared-cache in-memory database instead
+    agents = []
+    for i in range(2):
+        session_manager = SQLiteSessionManager(
+            session_id="temp-shared-session-001",
+            db_path=":memory:",
+            shared_memory=True
+        )
+        
+        agents.append(Agent(
+            session_manager=session_manager,
+            system_prompt="You are a helpful assistant for temporary tasks.",
+            agent_id=f"temp_agent_{i+1}"
+        ))
+    
+    for i, agent in enumerate(agents):
+        response = agent(f"Hello from temporary agent {i+1}!")
+        print(f"Agent {i+1}: {response}")
+    
+    # Note: Data lives until the program ends, even after the managers are gone
+
+
 if __name__ == "__main__":
     print("=== Basic Chat Example ===")
     basic_chat_example()
@@ -111,3 +138,6 @@ if __name__ == "__main__":
     
     print("\n=== In-Memory Database Example ===")
     memory_database_example()
+    
+    print("\n=== Shared In-Memory Database Example ===")
+    shared_memory_database_example()
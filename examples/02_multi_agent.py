@@ -5,10 +5,19 @@ This example demonstrates how to use multiple agents with the same session
 manager, enabling complex workflows and agent collaboration.
 """
 
+import re
+
 from strands import Agent
 
 from strands_sqlite_session_manager import SQLiteSessionManager
 
+_YES_RE = re.compile(r"\bYES\b", re.IGNORECASE)
+
+
+def _contains_yes(text: str) -> bool:
+    """Check for a standalone YES, ignoring case, without copying the text via upper()."""
+    return _YES_RE.search(text) is not None
+
 
 def multi_agent_conversation():
     """Demonstrate conversation between multiple agents."""
@@ -141,7 +150,7 @@ def agent_handoff_example():
     print(f"\nLevel 1 Decision: {escalation}")
     
     # Handoff to specialist
-    if "YES" in escalation.upper():
+    if _contains_yes(str(escalation)):
         print("\n--- Escalating to Technical Specialist ---\n")
         
         # Specialist reviews the conversation and provides solution
@@ -26,11 +26,13 @@ def streaming_example():
     print("=== Streaming Response Example ===\n")
     print("Generating story (streaming):")
     
-    # Stream a response - each chunk is still saved to the session
-    full_response = ""
+    # Stream a response - the assembled message is saved to the session
+    # once, when the stream ends, rather than chunk by chunk
+    chunks = []
     for chunk in agent("Tell me a short story about a robot learning to paint", stream=True):
         print(chunk, end="", flush=True)
-        full_response += chunk
+        chunks.append(chunk)
+    full_response = "".join(chunks)
     
     print("\n\n=== Full response saved to session ===")
     
@@ -104,13 +106,14 @@ def async_streaming_example():
         print("Explaining concept (async streaming):")
         
         # Async streaming
-        full_response = ""
+        chunks = []
         async for chunk in agent(
             "Explain quantum computing in simple terms", 
             stream=True
         ):
             print(chunk, end="", flush=True)
-            full_response += chunk
+            chunks.append(chunk)
+        full_response = "".join(chunks)
         
         print("\n\n=== Response saved asynchronously ===")
         
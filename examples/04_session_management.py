@@ -115,10 +115,8 @@ def multiple_databases_example():
     }
     
     # Create sessions in different databases
+    # The session manager creates each database's directory as needed
     for purpose, db_path in databases.items():
-        # Ensure directory exists
-        Path(db_path).parent.mkdir(parents=True, exist_ok=True)
-        
         session_manager = SQLiteSessionManager(
             session_id=f"{purpose}-session-001",
             db_path=db_path
@@ -203,8 +201,6 @@ def cleanup_old_sessions():
     ]
     
     for session_id, db_path in test_sessions:
-        Path(db_path).parent.mkdir(parents=True, exist_ok=True)
-        
         manager = SQLiteSessionManager(
             session_id=session_id,
             db_path=db_path
@@ -274,14 +270,9 @@ def backup_and_restore_example():
     
     print("=== Backup and Restore Example ===\n")
     
-    import shutil
-    
     original_db = "./backup_example/sessions.db"
     backup_db = "./backup_example/sessions_backup.db"
     
-    # Ensure directory exists
-    Path(original_db).parent.mkdir(parents=True, exist_ok=True)
-    
     # Create original session
     session_manager = SQLiteSessionManager(
         session_id="backup-session-001",
@@ -295,19 +286,33 @@ def backup_and_restore_example():
     agent("Important data that needs backing up")
     print("Original session created")
     
-    # Create backup
-    if Path(original_db).exists():
-        shutil.copy2(original_db, backup_db)
-        print(f"Backup created at {backup_db}")
+    # Create backup with SQLite's online backup API - unlike copying the file,
+    # this is consistent while the database is open and includes pending WAL data
+    session_manager.backup_to(backup_db)
+    print(f"Backup created at {backup_db}")
     
     # Simulate data loss (don't actually delete)
     print("Simulating data loss...")
     
-    # Restore from backup
-    if Path(backup_db).exists():
-        # In real scenario, you'd copy backup back to original
-        print(f"Backup available at {backup_db}")
-        print("Session can be restored from backup")
+    # Never restore over a database that is still open in this process:
+    # close every manager using it first
+    session_manager.close()
+    
+    # Restore from backup by copying it back over the original the same way
+    with SQLiteSessionManager(
+        session_id="backup-session-001",
+        db_path=backup_db
+    ) as backup_manager:
+        backup_manager.backup_to(original_db)
+    print(f"Session restored from {backup_db}")
+    
+    # Reopen the restored database
+    with SQLiteSessionManager(
+        session_id="backup-session-001",
+        db_path=original_db
+    ) as restored_manager:
+        restored_agent = Agent(session_manager=restored_manager)
+        print(f"Restored session has {len(restored_agent.messages)} messages")
 
 
 if __name__ == "__main__":
@@ -1,6 +1,6 @@
 """SQLite-based session manager for Strands agents."""
 
-from .manager import SQLiteSessionManager
+from .manager import MessageRow, SQLiteSessionManager
 
-__all__ = ["SQLiteSessionManager"]
+__all__ = ["MessageRow", "SQLiteSessionManager"]
 __version__ = "0.1.0"
@@ -1,23 +1,418 @@
 """SQLite session manager implementation."""
 
+import itertools
 import json
+import logging
+import math
 import os
+import queue
 import sqlite3
+import sys
+import threading
+from collections import OrderedDict
+from collections.abc import Callable, Iterable, Iterator
+from contextlib import contextmanager
+from dataclasses import fields, is_dataclass
 from pathlib import Path
-from typing import Any
+from typing import Any, Generic, NamedTuple, TypeVar
 
 from strands.session import RepositorySessionManager, SessionRepository
 from strands.types.exceptions import SessionException
 from strands.types.session import Session, SessionAgent, SessionMessage
 
+try:
+    import orjson
+except ImportError:  # pragma: no cover - optional dependency
+    orjson = None  # type: ignore[assignment]
+
+logger = logging.getLogger(__name__)
+
+
+# Serializer entry points bound once, so per-row loops skip the module attribute lookups.
+_orjson_dumps: Callable[..., bytes] | None = orjson.dumps if orjson is not None else None
+_ORJSON_OPTIONS = orjson.OPT_NON_STR_KEYS if orjson is not None else 0
+_json_dumps = json.dumps
+_json_loads = json.loads
+
+
+def _has_non_finite(obj: Any) -> bool:
+    """Whether obj holds a NaN or infinite float anywhere in its values."""
+    if isinstance(obj, float):
+        return obj != obj or obj in (math.inf, -math.inf)
+    if isinstance(obj, dict):
+        return any(_has_non_finite(value) for value in obj.values())
+    if isinstance(obj, (list, tuple)):
+        return any(_has_non_finite(value) for value in obj)
+    if is_dataclass(obj):
+        return any(_has_non_finite(getattr(obj, field.name)) for field in fields(obj))
+    return False
+
+
+def _dumps(obj: Any) -> bytes:
+    """Serialize obj to UTF-8 JSON bytes, using orjson when it is installed.
+
+    Payloads are stored as BLOBs so neither side transcodes them: orjson's output is bound as is, and on read
+    SQLite hands back the same bytes for the parser.
+    """
+    if _orjson_dumps is not None:
+        try:
+            data = _orjson_dumps(obj, option=_ORJSON_OPTIONS)
+        except TypeError:
+            # Values orjson rejects but json accepts (e.g. integers wider than 64 bits).
+            pass
+        else:
+            # orjson writes NaN and Infinity as null, where json keeps them; only a payload containing null can
+            # have been affected, so the walk is skipped for everything else.
+            if b"null" not in data or not _has_non_finite(obj):
+                return data
+    return _json_dumps(obj).encode()
+
+
+# Record types orjson can encode directly. It silently skips dataclass fields whose names start with an
+# underscore (e.g. SessionAgent._internal_state), which to_dict() keeps.
+_DIRECT_RECORD_TYPES = frozenset(
+    cls for cls in (Session, SessionAgent, SessionMessage) if not any(f.name.startswith("_") for f in fields(cls))
+)
+
+
+def _dumps_record(record: Session | SessionAgent | SessionMessage) -> bytes:
+    """Serialize a session, agent or message dataclass to the same JSON bytes as ``_dumps(record.to_dict())``.
+
+    orjson encodes dataclasses natively, which skips building the intermediate dict tree. Records orjson cannot
+    encode identically go through to_dict(): bytes values need its base64 envelope, and non-finite floats need json.
+    """
+    if _orjson_dumps is not None and type(record) in _DIRECT_RECORD_TYPES:
+        try:
+            data = _orjson_dumps(record, option=_ORJSON_OPTIONS)
+        except TypeError:
+            pass
+        else:
+            if b"null" not in data or not _has_non_finite(record):
+                return data
+    return _dumps(record.to_dict())
+
+
+if orjson is not None:
+    _orjson_loads = orjson.loads
+    _OrjsonDecodeError = orjson.JSONDecodeError
+
+    def _loads(data: str | bytes) -> Any:
+        """Parse JSON with orjson, falling back to json for NaN/Infinity, which orjson rejects."""
+        try:
+            return _orjson_loads(data)
+        except _OrjsonDecodeError:
+            return _json_loads(data)
+
+else:  # pragma: no cover - optional dependency
+    _loads = json.loads
+
+_message_from_dict = SessionMessage.from_dict
+
+# Prepared statements kept per connection, keyed by SQL text; sized well above the number of distinct
+# statements the manager issues so the hot INSERT/SELECT paths never get re-parsed.
+_STATEMENT_CACHE_SIZE = 256
+
+# Every connection maps the file separately, so a 32-bit address space cannot afford a 256 MiB mapping per
+# pooled connection; memory-mapped reads are off by default there.
+_DEFAULT_MMAP_SIZE = 268435456 if sys.maxsize > 2**32 else 0
+
+# Rows pulled per fetchmany() when streaming message history.
+_FETCH_BATCH_SIZE = 512
+
+
+# (database, session_id, entry): the entry is an agent_id, or None for a session's own row.
+_CacheKey = tuple[str, str, str | None]
+
+
+# A stored message as (message_id, JSON payload). Rows written before payloads became BLOBs come back as text.
+_MessagePayload = tuple[int, bytes | str]
+
+_T = TypeVar("_T")
+
+
+class _PayloadCache(Generic[_T]):
+    """Process-wide LRU of serialized payloads keyed by (database, session_id, entry).
+
+    Payloads are kept as the stored JSON rather than decoded objects, since strands mutates the records it
+    restores (e.g. redaction). Every write bumps the generation, and a read only fills the cache if no write landed
+    between starting its query and storing the result.
+    """
+
+    def __init__(self, maxsize: int) -> None:
+        self._maxsize = maxsize
+        self._entries: OrderedDict[_CacheKey, _T] = OrderedDict()
+        self._lock = threading.Lock()
+        self._generation = 0
+
+    @property
+    def generation(self) -> int:
+        return self._generation
+
+    def get(self, key: _CacheKey) -> _T | None:
+        with self._lock:
+            payload = self._entries.get(key)
+            if payload is not None:
+                self._entries.move_to_end(key)
+            return payload
+
+    def put(self, key: _CacheKey, payload: _T, generation: int) -> None:
+        with self._lock:
+            if generation != self._generation:
+                return
+            self._entries[key] = payload
+            self._entries.move_to_end(key)
+            while len(self._entries) > self._maxsize:
+                self._entries.popitem(last=False)
+
+    def invalidate(self, database: str, session_id: str, entry: str | None = None) -> None:
+        """Drop one entry, or everything cached for the session when entry is None."""
+        with self._lock:
+            self._generation += 1
+            if entry is not None:
+                self._entries.pop((database, session_id, entry), None)
+                return
+            for key in [key for key in self._entries if key[:2] == (database, session_id)]:
+                del self._entries[key]
+
+    def invalidate_database(self, database: str) -> None:
+        """Drop everything cached for a database, e.g. after its file is overwritten."""
+        with self._lock:
+            self._generation += 1
+            for key in [key for key in self._entries if key[0] == database]:
+                del self._entries[key]
+
+
+# Message history per agent.
+_history_cache: _PayloadCache[list[_MessagePayload]] = _PayloadCache(maxsize=128)
+# Session rows (entry None) and agent rows (entry agent_id), for repeated read_session/read_agent calls in a turn.
+_record_cache: _PayloadCache[bytes | str] = _PayloadCache(maxsize=128)
+
+# In-memory databases are private to their manager, so each gets its own cache namespace.
+_memory_db_ids = itertools.count()
+
+# Shared-cache URI for the one in-memory database every shared_memory manager in the process uses. The
+# sentinel connection keeps that database alive when no manager has it open.
+_SHARED_MEMORY_URI = "file::memory:?cache=shared"
+_shared_memory_sentinel: sqlite3.Connection | None = None
+_shared_memory_lock = threading.Lock()
+
+
+def _ensure_shared_memory_sentinel() -> None:
+    """Open the connection that keeps the shared in-memory database alive, once per process."""
+    global _shared_memory_sentinel
+    with _shared_memory_lock:
+        if _shared_memory_sentinel is None:
+            _shared_memory_sentinel = sqlite3.connect(_SHARED_MEMORY_URI, uri=True, check_same_thread=False)
+
+
+# Directories already created by this process; repeated constructors on the same path skip the stat + mkdir.
+_ready_dirs: set[str] = set()
+
+
+def _ensure_parent_dir(path: str) -> None:
+    """Create the directory holding path, at most once per process for each directory."""
+    parent = os.path.dirname(os.path.abspath(path))
+    if parent not in _ready_dirs:
+        os.makedirs(parent, exist_ok=True)
+        _ready_dirs.add(parent)
+
+
+# Bump whenever the DDL in _SCHEMA changes; databases at this user_version skip the bootstrap script.
+_SCHEMA_VERSION = 1
+
+_SCHEMA = f"""
+    BEGIN IMMEDIATE;
+
+    CREATE TABLE IF NOT EXISTS sessions (
+        session_id TEXT PRIMARY KEY,
+        data BLOB NOT NULL,
+        created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+        updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+    );
+
+    CREATE TABLE IF NOT EXISTS agents (
+        session_id TEXT NOT NULL,
+        agent_id TEXT NOT NULL,
+        data BLOB NOT NULL,
+        created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+        updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+        PRIMARY KEY (session_id, agent_id),
+        FOREIGN KEY (session_id) REFERENCES sessions(session_id) ON DELETE CASCADE
+    ) WITHOUT ROWID;
+
+    CREATE TABLE IF NOT EXISTS messages (
+        session_id TEXT NOT NULL,
+        agent_id TEXT NOT NULL,
+        message_id INTEGER NOT NULL,
+        data BLOB NOT NULL,
+        created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+        updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+        PRIMARY KEY (session_id, agent_id, message_id),
+        FOREIGN KEY (session_id, agent_id) REFERENCES agents(session_id, agent_id) ON DELETE CASCADE
+    ) WITHOUT ROWID;
+
+    CREATE TABLE IF NOT EXISTS multi_agents (
+        session_id TEXT NOT NULL,
+        multi_agent_id TEXT NOT NULL,
+        data BLOB NOT NULL,
+        created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+        updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+        PRIMARY KEY (session_id, multi_agent_id),
+        FOREIGN KEY (session_id) REFERENCES sessions(session_id) ON DELETE CASCADE
+    ) WITHOUT ROWID;
+
+    -- These duplicated primary key prefixes; they only remain in databases created by older versions.
+    DROP INDEX IF EXISTS idx_messages_session_agent;
+    DROP INDEX IF EXISTS idx_agents_session;
+    DROP INDEX IF EXISTS idx_multi_agents_session;
+
+    PRAGMA user_version = {_SCHEMA_VERSION};
+    COMMIT;
+"""
+
+
+class _Connections:
+    """The writer, read pool and write-transaction state shared by every manager open on one database."""
+
+    def __init__(self, writer: sqlite3.Connection, readers: queue.Queue[sqlite3.Connection] | None) -> None:
+        self.writer = writer
+        self.readers = readers
+        # Serializes use of the writer; re-entrant so batches can nest and read their own writes.
+        self.write_lock = threading.RLock()
+        # Per-thread batch depth. Shared so two managers used from the same thread join one transaction instead
+        # of one committing the other's half-finished batch.
+        self.local = threading.local()
+        # Cache entries to drop once the current write commits or rolls back, as (session_id, agent_id or None).
+        self.pending_invalidations: set[tuple[str, str | None]] = set()
+        self.pending_record_invalidations: set[tuple[str, str | None]] = set()
+        self.optimize_stop = threading.Event()
+        self.refs = 0
+        self.closed = False
+
+    def close_pooled_readers(self) -> None:
+        """Close the readers currently in the pool; checked-out readers are closed when they are returned."""
+        if self.readers is None:
+            return
+        while True:
+            try:
+                self.readers.get_nowait().close()
+            except queue.Empty:
+                return
+
+    def close(self, optimize: bool) -> None:
+        """Stop the optimizer and close every connection; later calls do nothing."""
+        with self.write_lock:
+            if self.closed:
+                return
+            self.closed = True
+            self.optimize_stop.set()
+            self.close_pooled_readers()
+            if optimize:
+                self.writer.execute("PRAGMA optimize")
+            self.writer.close()
+
+
+_ConnectionsKey = tuple[Any, ...]
+
+# Connections currently open, keyed by database and connection settings, so managers created per request reuse
+# one writer and read pool instead of reopening the file (and its -wal/-shm) every time.
+_open_connections: dict[_ConnectionsKey, _Connections] = {}
+# Only guards the table, never file I/O. Re-entrant because the garbage collector can run an unclosed manager's
+# __del__ (and so close()) on a thread that already holds it.
+_open_connections_lock = threading.RLock()
+
+
+def _optimize_periodically(db_path: str, interval: float, stop: threading.Event) -> None:
+    """Run PRAGMA optimize on a private connection every interval seconds until stopped."""
+    while not stop.wait(interval):
+        try:
+            conn = sqlite3.connect(db_path)
+            try:
+                conn.execute("PRAGMA optimize")
+            finally:
+                conn.close()
+        except sqlite3.Error as e:
+            logger.debug("db_path=<%s> | periodic optimize failed: %s", db_path, e)
+
+
+class MessageRow(NamedTuple):
+    """A message addressed to one agent in a session, for bulk inserts."""
+
+    session_id: str
+    agent_id: str
+    message: SessionMessage
+
 
 class SQLiteSessionManager(RepositorySessionManager, SessionRepository):
     """SQLite-based session manager for local storage."""
 
+    # Statements are fixed for the lifetime of the schema, so they are built once here and every call passes the
+    # identical string, which is what sqlite3's per-connection statement cache is keyed on.
+    _SQL_INSERT_SESSION = "INSERT INTO sessions (session_id, data) VALUES (?, ?)"
+    _SQL_SELECT_SESSION = "SELECT data FROM sessions WHERE session_id = ?"
+    _SQL_DELETE_SESSION = "DELETE FROM sessions WHERE session_id = ?"
+    # Child inserts select their values only if the parent row exists, so a missing parent shows up as rowcount 0
+    # instead of a foreign key error that would have to be told apart from a duplicate by its message text.
+    _SQL_INSERT_AGENT = (
+        "INSERT INTO agents (session_id, agent_id, data) "
+        "SELECT ?1, ?2, ?3 WHERE EXISTS (SELECT 1 FROM sessions WHERE session_id = ?1)"
+    )
+    _SQL_SELECT_AGENT = "SELECT data FROM agents WHERE session_id = ? AND agent_id = ?"
+    _SQL_UPDATE_AGENT = (
+        "UPDATE agents SET data = ?, updated_at = CURRENT_TIMESTAMP WHERE session_id = ? AND agent_id = ?"
+    )
+    _SQL_INSERT_MESSAGE = (
+        "INSERT INTO messages (session_id, agent_id, message_id, data) "
+        "SELECT ?1, ?2, ?3, ?4 WHERE EXISTS (SELECT 1 FROM agents WHERE session_id = ?1 AND agent_id = ?2)"
+    )
+    _SQL_SELECT_MESSAGE = "SELECT data FROM messages WHERE session_id = ? AND agent_id = ? AND message_id = ?"
+    _SQL_UPDATE_MESSAGE = (
+        "UPDATE messages SET data = ?, updated_at = CURRENT_TIMESTAMP "
+        "WHERE session_id = ? AND agent_id = ? AND message_id = ?"
+    )
+    _SQL_INSERT_MULTI_AGENT = (
+        "INSERT INTO multi_agents (session_id, multi_agent_id, data) "
+        "SELECT ?1, ?2, ?3 WHERE EXISTS (SELECT 1 FROM sessions WHERE session_id = ?1)"
+    )
+    _SQL_SELECT_MULTI_AGENT = "SELECT data FROM multi_agents WHERE session_id = ? AND multi_agent_id = ?"
+    _SQL_UPDATE_MULTI_AGENT = (
+        "UPDATE multi_agents SET data = ?, updated_at = CURRENT_TIMESTAMP WHERE session_id = ? AND multi_agent_id = ?"
+    )
+    # Upserts for save_turn, so replaying a turn overwrites its rows instead of failing on the primary key.
+    _SQL_UPSERT_SESSION = (
+        "INSERT INTO sessions (session_id, data) VALUES (?, ?) "
+        "ON CONFLICT (session_id) DO UPDATE SET data = excluded.data, updated_at = CURRENT_TIMESTAMP"
+    )
+    _SQL_UPSERT_AGENT = (
+        "INSERT INTO agents (session_id, agent_id, data) VALUES (?, ?, ?) "
+        "ON CONFLICT (session_id, agent_id) DO UPDATE SET data = excluded.data, updated_at = CURRENT_TIMESTAMP"
+    )
+    _SQL_UPSERT_MESSAGE = (
+        "INSERT INTO messages (session_id, agent_id, message_id, data) VALUES (?, ?, ?, ?) "
+        "ON CONFLICT (session_id, agent_id, message_id) DO UPDATE SET data = excluded.data, "
+        "updated_at = CURRENT_TIMESTAMP"
+    )
+    _SQL_LIST_MESSAGES = (
+        "SELECT message_id, data FROM messages WHERE session_id = ? AND agent_id = ? ORDER BY message_id"
+    )
+    _SQL_LIST_MESSAGES_PAGE = _SQL_LIST_MESSAGES + " LIMIT ? OFFSET ?"
+    _SQL_LIST_MESSAGES_AFTER = (
+        "SELECT message_id, data FROM messages WHERE session_id = ? AND agent_id = ? AND message_id > ? "
+        "ORDER BY message_id LIMIT ?"
+    )
+
     def __init__(
         self,
         session_id: str,
         db_path: str | None = None,
+        journal_mode: str = "wal",
+        wal_autocheckpoint: int = 1000,
+        mmap_size: int = _DEFAULT_MMAP_SIZE,
+        cache_size: int | None = -65536,
+        pool_size: int = 4,
+        optimize_interval: float | None = 900.0,
+        cache_reads: bool = True,
+        shared_memory: bool = False,
         **kwargs: Any,
     ) -> None:
         """Initialize SQLite session manager.
@@ -25,78 +420,278 @@ class SQLiteSessionManager(RepositorySessionManager, SessionRepository):
         Args:
             session_id: Session identifier
             db_path: Path to SQLite database file (default: ./sessions.db or STRANDS_SQLITE_DB_PATH env var)
+            journal_mode: "wal" (default) or "wal2"; wal2 alternates between two WAL files so checkpoints never
+                stall writers, but needs a SQLite build from the wal2 branch and falls back to "wal" otherwise
+            wal_autocheckpoint: WAL pages written before SQLite checkpoints automatically; 0 disables
+                automatic checkpoints so they can be run off the request path
+            mmap_size: Bytes of the database file SQLite may memory-map for reads (default: 256 MiB, or 0 on
+                32-bit interpreters); 0 disables
+            cache_size: Page cache size per connection, in pages or negative KiB as in PRAGMA cache_size
+                (default: 64 MiB); None keeps SQLite's default
+            pool_size: Number of long-lived read connections kept alongside the single writer connection
+                (ignored for :memory:, where every read shares the writer)
+            optimize_interval: Seconds between background PRAGMA optimize runs (default: 15 minutes); None
+                disables the background thread. Never started for :memory:
+            cache_reads: Keep message history, session rows and agent rows in process-wide caches shared by every
+                manager on the same database, invalidated by this process's writes. Disable when other processes
+                write to the database
+            shared_memory: With db_path=":memory:", open the process-wide shared-cache in-memory database instead
+                of a private one, so several managers (and agents) can share sessions without a file
             **kwargs: Additional arguments passed to parent
         """
         self._db_path = db_path or os.getenv("STRANDS_SQLITE_DB_PATH", "./sessions.db")
+        self._journal_mode = journal_mode.lower()
+        self._wal_autocheckpoint = wal_autocheckpoint
+        self._mmap_size = mmap_size
+        self._cache_size = cache_size
+        self._pool_size = pool_size
+        self._optimize_interval = optimize_interval
+        self._cache_reads = cache_reads
+        self._shared_memory = shared_memory and self._db_path == ":memory:"
+        if self._shared_memory:
+            self._cache_key = _SHARED_MEMORY_URI
+        elif self._db_path == ":memory:":
+            self._cache_key = f":memory:{next(_memory_db_ids)}"
+        else:
+            self._cache_key = os.path.realpath(self._db_path)
+        self._connections: _Connections | None = None
         self._conn: sqlite3.Connection | None = None
+        if self._journal_mode not in ("wal", "wal2"):
+            raise ValueError(f"Unsupported journal_mode {journal_mode!r}; expected 'wal' or 'wal2'")
         self._initialize_db()
 
         # Initialize parent with self as the repository
         super().__init__(session_id=session_id, session_repository=self, **kwargs)
 
     def _initialize_db(self) -> None:
-        """Initialize database connection and schema."""
+        """Attach to the process's open connections for this database, opening them on first use."""
+        # A private in-memory database lives and dies with its writer, so it is never shared.
+        private = self._db_path == ":memory:" and not self._shared_memory
+        self._connections_key = (
+            self._cache_key,
+            self._journal_mode,
+            self._wal_autocheckpoint,
+            self._mmap_size,
+            self._cache_size,
+            self._pool_size,
+            self._optimize_interval,
+        )
+        connections = None
+        if not private:
+            with _open_connections_lock:
+                connections = _open_connections.get(self._connections_key)
+                if connections is not None:
+                    connections.refs += 1
+        if connections is None:
+            # Opened without the table lock so a slow open (or busy_timeout wait) never stalls other databases.
+            opened = self._open_connections()
+            with _open_connections_lock:
+                connections = opened if private else _open_connections.setdefault(self._connections_key, opened)
+                connections.refs += 1
+            if connections is not opened:
+                # Another thread opened the same database first.
+                opened.close(optimize=False)
+
+        self._connections = connections
+        self._conn = connections.writer
+        self._readers = connections.readers
+        self._write_lock = connections.write_lock
+        self._local = connections.local
+        self._pending_invalidations = connections.pending_invalidations
+        self._pending_record_invalidations = connections.pending_record_invalidations
+        self._optimize_stop = connections.optimize_stop
+
+    def _open_connections(self) -> _Connections:
+        """Open the writer and read pool, bootstrap the schema, and start the background optimizer."""
+        if self._shared_memory:
+            _ensure_shared_memory_sentinel()
+        elif self._db_path != ":memory:":
+            _ensure_parent_dir(self._db_path)
+
+        try:
+            conn = self._connect()
+        except sqlite3.OperationalError:
+            if self._db_path == ":memory:" or self._shared_memory:
+                raise
+            # The directory may have been removed since this process created it.
+            _ready_dirs.discard(os.path.dirname(os.path.abspath(self._db_path)))
+            _ensure_parent_dir(self._db_path)
+            conn = self._connect()
+
+        # Checked on every open rather than remembered per path, since the file may have been deleted or replaced
+        # since. IF NOT EXISTS keeps the script idempotent when several processes race to bootstrap the same file.
+        if conn.execute("PRAGMA user_version").fetchone()[0] < _SCHEMA_VERSION:
+            try:
+                conn.executescript(_SCHEMA)
+            except sqlite3.Error:
+                conn.rollback()
+                raise
+
+        readers: queue.Queue[sqlite3.Connection] | None = None
+        # An in-memory database is private to its connection, so it cannot be pooled.
+        if self._db_path != ":memory:" and self._pool_size > 0:
+            readers = queue.Queue(maxsize=self._pool_size)
+            for _ in range(self._pool_size):
+                readers.put(self._connect(read_only=True))
+
+        connections = _Connections(conn, readers)
+        if self._db_path != ":memory:" and self._optimize_interval is not None:
+            threading.Thread(
+                target=_optimize_periodically,
+                # The resolved path, so a later chdir cannot point the thread at another (new, empty) file.
+                args=(self._cache_key, self._optimize_interval, connections.optimize_stop),
+                name="sqlite-session-optimize",
+                daemon=True,
+            ).start()
+        return connections
+
+    def _connect(self, read_only: bool = False) -> sqlite3.Connection:
+        """Open a connection with a large statement cache and the per-connection pragmas applied.
+
+        Read-only connections are opened with ``mode=ro`` so they can never take the write lock.
+        """
+        if self._shared_memory:
+            database, uri = _SHARED_MEMORY_URI, True
+        elif read_only:
+            database, uri = f"{Path(self._db_path).resolve().as_uri()}?mode=ro", True
+        else:
+            database, uri = self._db_path, False
+        conn = sqlite3.connect(database, check_same_thread=False, cached_statements=_STATEMENT_CACHE_SIZE, uri=uri)
+        self._configure_connection(conn, read_only=read_only)
+        return conn
+
+    def _configure_connection(self, conn: sqlite3.Connection, read_only: bool = False) -> None:
+        """Apply per-connection pragmas once, right after the connection is opened."""
         if self._db_path != ":memory:":
-            Path(self._db_path).parent.mkdir(parents=True, exist_ok=True)
-
-        self._conn = sqlite3.connect(self._db_path, check_same_thread=False)
-        self._conn.execute("PRAGMA journal_mode=WAL")
-        self._conn.execute("PRAGMA foreign_keys=ON")
-
-        self._conn.executescript("""
-            CREATE TABLE IF NOT EXISTS sessions (
-                session_id TEXT PRIMARY KEY,
-                data TEXT NOT NULL,
-                created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
-                updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
-            );
-            
-            CREATE TABLE IF NOT EXISTS agents (
-                session_id TEXT NOT NULL,
-                agent_id TEXT NOT NULL,
-                data TEXT NOT NULL,
-                created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
-                updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
-                PRIMARY KEY (session_id, agent_id),
-                FOREIGN KEY (session_id) REFERENCES sessions(session_id) ON DELETE CASCADE
-            );
-            
-            CREATE TABLE IF NOT EXISTS messages (
-                session_id TEXT NOT NULL,
-                agent_id TEXT NOT NULL,
-                message_id INTEGER NOT NULL,
-                data TEXT NOT NULL,
-                created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
-                updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
-                PRIMARY KEY (session_id, agent_id, message_id),
-                FOREIGN KEY (session_id, agent_id) REFERENCES agents(session_id, agent_id) ON DELETE CASCADE
-            );
-            
-            CREATE TABLE IF NOT EXISTS multi_agents (
-                session_id TEXT NOT NULL,
-                multi_agent_id TEXT NOT NULL,
-                data TEXT NOT NULL,
-                created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
-                updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
-                PRIMARY KEY (session_id, multi_agent_id),
-                FOREIGN KEY (session_id) REFERENCES sessions(session_id) ON DELETE CASCADE
-            );
-            
-            CREATE INDEX IF NOT EXISTS idx_messages_session_agent ON messages(session_id, agent_id, message_id);
-            CREATE INDEX IF NOT EXISTS idx_agents_session ON agents(session_id);
-            CREATE INDEX IF NOT EXISTS idx_multi_agents_session ON multi_agents(session_id);
-        """)
-        self._conn.commit()
+            if not read_only:
+                # WAL lets readers proceed during writes; NORMAL sync drops the per-commit fsync,
+                # which is still durable against application crashes in WAL mode.
+                mode = conn.execute(f"PRAGMA journal_mode={self._journal_mode}").fetchone()[0]
+                if mode.lower() != self._journal_mode:
+                    # Builds without wal2 ignore the unknown mode and report the current one.
+                    conn.execute("PRAGMA journal_mode=WAL")
+                conn.execute("PRAGMA synchronous=NORMAL")
+                conn.execute(f"PRAGMA wal_autocheckpoint={int(self._wal_autocheckpoint)}")
+            # Only reads are served from the mapping; writes still go through the pager.
+            conn.execute(f"PRAGMA mmap_size={int(self._mmap_size)}")
+            if read_only:
+                conn.execute("PRAGMA query_only=ON")
+                # Readers only fetch payloads, which the parser takes as UTF-8 bytes; this also spares TEXT
+                # payloads from older databases a decode to str.
+                conn.text_factory = bytes
+        conn.execute("PRAGMA busy_timeout=5000")
+        # Keep sorter and temp-index spills for ORDER BY / GROUP BY off disk.
+        conn.execute("PRAGMA temp_store=MEMORY")
+        if self._cache_size is not None:
+            conn.execute(f"PRAGMA cache_size={int(self._cache_size)}")
+        conn.execute("PRAGMA foreign_keys=ON")
+
+    @contextmanager
+    def _reader(self) -> Iterator[sqlite3.Connection]:
+        """Borrow a pooled read connection for the duration of the block."""
+        # Reads inside a batch must see its uncommitted writes, so they stay on the writer. Without a pool the
+        # writer is shared, so the read has to wait for any other thread's batch to finish.
+        connections = self._connections
+        if connections is None or connections.closed:
+            raise SessionException("Session manager is closed")
+        if self._readers is None or self._batch_depth:
+            with self._write_lock:
+                yield self._conn
+            return
+
+        while True:
+            try:
+                conn = self._readers.get(timeout=1.0)
+                break
+            except queue.Empty:
+                # close() drains the pool, so a reader waiting on it would otherwise block forever.
+                if connections.closed:
+                    raise SessionException("Session manager is closed")
+        try:
+            yield conn
+        finally:
+            # Readers checked out while the pool was closed are closed here rather than returned to it.
+            if connections.closed:
+                conn.close()
+            else:
+                self._readers.put(conn)
+                if connections.closed:
+                    # Lost a race with close(), which may already have drained the pool.
+                    connections.close_pooled_readers()
+
+    @property
+    def _batch_depth(self) -> int:
+        """Nesting depth of the calling thread's batch; only the thread holding the write lock can be non-zero."""
+        return getattr(self._local, "batch_depth", 0)
+
+    @_batch_depth.setter
+    def _batch_depth(self, value: int) -> None:
+        self._local.batch_depth = value
+
+    def _commit(self) -> None:
+        """Commit the current write unless it is part of a batch."""
+        if not self._batch_depth:
+            self._conn.commit()
+            self._flush_invalidations()
+
+    def _invalidate_history(self, session_id: str, agent_id: str | None = None) -> None:
+        """Mark cached history stale; it is dropped once the write is committed or rolled back."""
+        self._pending_invalidations.add((session_id, agent_id))
+
+    def _invalidate_records(self, session_id: str, agent_id: str | None = None) -> None:
+        """Mark a cached agent row, or a session row and all its agents, stale; dropped like history."""
+        self._pending_record_invalidations.add((session_id, agent_id))
+
+    def _flush_invalidations(self) -> None:
+        """Drop cached history and rows touched by the writes just committed or rolled back."""
+        while self._pending_invalidations:
+            session_id, agent_id = self._pending_invalidations.pop()
+            _history_cache.invalidate(self._cache_key, session_id, agent_id)
+        while self._pending_record_invalidations:
+            session_id, agent_id = self._pending_record_invalidations.pop()
+            _record_cache.invalidate(self._cache_key, session_id, agent_id)
+
+    @contextmanager
+    def _batch(self) -> Iterator[None]:
+        """Hold the writer for the block so every write made inside it lands in a single transaction."""
+        with self._write_lock:
+            if not self._batch_depth and not self._conn.in_transaction:
+                # Take the write lock up front so a batch that reads before it writes cannot hit SQLITE_BUSY midway.
+                self._conn.execute("BEGIN IMMEDIATE")
+            self._batch_depth += 1
+            try:
+                yield
+            except BaseException:
+                self._batch_depth -= 1
+                if not self._batch_depth:
+                    self._conn.rollback()
+                    self._flush_invalidations()
+                raise
+            self._batch_depth -= 1
+            self._commit()
+
+    @contextmanager
+    def transaction(self) -> Iterator[None]:
+        """Group several writes into one transaction and one commit, e.g. everything persisted for an agent turn.
+
+        Writes inside the block are committed together when it exits and rolled back if it raises. Blocks may be
+        nested; only the outermost one commits.
+        """
+        with self._batch():
+            yield
+
+    def initialize(self, agent: Any, **kwargs: Any) -> None:
+        """Initialize an agent, writing the agent row and its seed messages in one transaction."""
+        with self._batch():
+            super().initialize(agent, **kwargs)
 
     def create_session(self, session: Session) -> None:
         """Create a new session."""
         try:
-            data = json.dumps(session.to_dict())
-            self._conn.execute(
-                "INSERT INTO sessions (session_id, data) VALUES (?, ?)",
-                (session.session_id, data),
-            )
-            self._conn.commit()
+            data = _dumps_record(session)
+            with self._batch():
+                self._conn.execute(self._SQL_INSERT_SESSION, (session.session_id, data))
+                self._invalidate_records(session.session_id)
         except sqlite3.IntegrityError:
             raise SessionException(f"Session {session.session_id} already exists")
         except Exception as e:
@@ -104,199 +699,359 @@ class SQLiteSessionManager(RepositorySessionManager, SessionRepository):
 
     def read_session(self, session_id: str) -> Session | None:
         """Read a session."""
-        cursor = self._conn.execute("SELECT data FROM sessions WHERE session_id = ?", (session_id,))
-        row = cursor.fetchone()
-        if not row:
+        payload = self._read_record(session_id, None, self._SQL_SELECT_SESSION, (session_id,))
+        if payload is None:
             return None
 
         try:
-            return Session.from_dict(json.loads(row[0]))
+            return Session.from_dict(_loads(payload))
         except Exception as e:
             raise SessionException(f"Failed to read session: {e}")
 
+    def _read_record(
+        self, session_id: str, agent_id: str | None, sql: str, params: tuple[str, ...]
+    ) -> bytes | str | None:
+        """Fetch a session row (agent_id None) or agent row payload, through the record cache when reads are cached."""
+        # Rows read inside a batch may still be rolled back, so they never populate the cache.
+        cacheable = self._cache_reads and not self._batch_depth
+        if cacheable:
+            key = (self._cache_key, session_id, agent_id)
+            payload = _record_cache.get(key)
+            if payload is not None:
+                return payload
+            generation = _record_cache.generation
+
+        with self._reader() as conn:
+            row = conn.execute(sql, params).fetchone()
+        if not row:
+            return None
+        if cacheable:
+            _record_cache.put(key, row[0], generation)
+        return row[0]
+
     def delete_session(self, session_id: str) -> None:
         """Delete a session and all related data."""
-        cursor = self._conn.execute("DELETE FROM sessions WHERE session_id = ?", (session_id,))
-        self._conn.commit()
+        with self._batch():
+            cursor = self._conn.execute(self._SQL_DELETE_SESSION, (session_id,))
+            self._invalidate_history(session_id)
+            self._invalidate_records(session_id)
         if cursor.rowcount == 0:
             raise SessionException(f"Session {session_id} not found")
 
     def create_agent(self, session_id: str, agent: SessionAgent) -> None:
         """Create an agent in a session."""
         try:
-            data = json.dumps(agent.to_dict())
-            self._conn.execute(
-                "INSERT INTO agents (session_id, agent_id, data) VALUES (?, ?, ?)",
-                (session_id, agent.agent_id, data),
-            )
-            self._conn.commit()
-        except sqlite3.IntegrityError as e:
-            if "FOREIGN KEY" in str(e):
-                raise SessionException(f"Session {session_id} not found")
+            data = _dumps_record(agent)
+            with self._batch():
+                cursor = self._conn.execute(self._SQL_INSERT_AGENT, (session_id, agent.agent_id, data))
+                self._invalidate_records(session_id, agent.agent_id)
+        except sqlite3.IntegrityError:
             raise SessionException(f"Agent {agent.agent_id} already exists in session {session_id}")
         except Exception as e:
             raise SessionException(f"Failed to create agent: {e}")
+        if cursor.rowcount == 0:
+            raise SessionException(f"Session {session_id} not found")
 
     def read_agent(self, session_id: str, agent_id: str) -> SessionAgent | None:
         """Read an agent from a session."""
-        cursor = self._conn.execute(
-            "SELECT data FROM agents WHERE session_id = ? AND agent_id = ?",
-            (session_id, agent_id),
-        )
-        row = cursor.fetchone()
-        if not row:
+        payload = self._read_record(session_id, agent_id, self._SQL_SELECT_AGENT, (session_id, agent_id))
+        if payload is None:
             return None
 
         try:
-            return SessionAgent.from_dict(json.loads(row[0]))
+            return SessionAgent.from_dict(_loads(payload))
         except Exception as e:
             raise SessionException(f"Failed to read agent: {e}")
 
     def update_agent(self, session_id: str, agent: SessionAgent) -> None:
         """Update an agent in a session."""
-        cursor = self._conn.execute(
-            "SELECT created_at FROM agents WHERE session_id = ? AND agent_id = ?",
-            (session_id, agent.agent_id),
-        )
-        row = cursor.fetchone()
-        if not row:
-            raise SessionException(f"Agent {agent.agent_id} not found in session {session_id}")
-
         try:
-            data = json.dumps(agent.to_dict())
-            self._conn.execute(
-                "UPDATE agents SET data = ?, updated_at = CURRENT_TIMESTAMP WHERE session_id = ? AND agent_id = ?",
-                (data, session_id, agent.agent_id),
-            )
-            self._conn.commit()
+            data = _dumps_record(agent)
+            with self._batch():
+                cursor = self._conn.execute(self._SQL_UPDATE_AGENT, (data, session_id, agent.agent_id))
+                self._invalidate_records(session_id, agent.agent_id)
         except Exception as e:
             raise SessionException(f"Failed to update agent: {e}")
+        if cursor.rowcount == 0:
+            raise SessionException(f"Agent {agent.agent_id} not found in session {session_id}")
 
     def create_message(self, session_id: str, agent_id: str, message: SessionMessage) -> None:
         """Create a message in an agent."""
         try:
-            data = json.dumps(message.to_dict())
-            self._conn.execute(
-                "INSERT INTO messages (session_id, agent_id, message_id, data) VALUES (?, ?, ?, ?)",
-                (session_id, agent_id, message.message_id, data),
-            )
-            self._conn.commit()
-        except sqlite3.IntegrityError as e:
-            if "FOREIGN KEY" in str(e):
-                raise SessionException(f"Agent {agent_id} not found in session {session_id}")
+            data = _dumps_record(message)
+            with self._batch():
+                cursor = self._conn.execute(self._SQL_INSERT_MESSAGE, (session_id, agent_id, message.message_id, data))
+                self._invalidate_history(session_id, agent_id)
+        except sqlite3.IntegrityError:
             raise SessionException(f"Message {message.message_id} already exists")
         except Exception as e:
             raise SessionException(f"Failed to create message: {e}")
+        if cursor.rowcount == 0:
+            raise SessionException(f"Agent {agent_id} not found in session {session_id}")
+
+    def create_messages(self, session_id: str, agent_id: str, messages: Iterable[SessionMessage]) -> None:
+        """Create several messages in an agent with a single executemany and commit."""
+        try:
+            self._insert_messages(
+                [(session_id, agent_id, message.message_id, _dumps_record(message)) for message in messages],
+                f"Agent {agent_id} not found in session {session_id}",
+            )
+        except SessionException:
+            raise
+        except sqlite3.IntegrityError as e:
+            raise SessionException(f"Message already exists: {e}")
+        except Exception as e:
+            raise SessionException(f"Failed to create messages: {e}")
+
+    def append_many(self, rows: Iterable[MessageRow]) -> None:
+        """Create messages across any number of agents with a single executemany and commit."""
+        try:
+            self._insert_messages(
+                [(row.session_id, row.agent_id, row.message.message_id, _dumps_record(row.message)) for row in rows],
+                "Agent not found for one or more messages",
+            )
+        except SessionException:
+            raise
+        except sqlite3.IntegrityError as e:
+            raise SessionException(f"Message already exists: {e}")
+        except Exception as e:
+            raise SessionException(f"Failed to create messages: {e}")
+
+    def _insert_messages(self, params: list[tuple[str, str, int, bytes]], not_found: str) -> None:
+        """Insert serialized message rows in one transaction, rolling all of them back on failure."""
+        with self._batch():
+            cursor = self._conn.executemany(self._SQL_INSERT_MESSAGE, params)
+            if cursor.rowcount < len(params):
+                raise SessionException(not_found)
+            for session_id, agent_id, _, _ in params:
+                self._invalidate_history(session_id, agent_id)
+
+    def save_turn(self, session: Session, agent: SessionAgent, message: SessionMessage) -> None:
+        """Write the session, the agent and one message in a single transaction.
+
+        Each row is inserted or overwritten, so saving the same turn twice is harmless and no existence checks are
+        needed beforehand.
+        """
+        try:
+            session_data = _dumps_record(session)
+            agent_data = _dumps_record(agent)
+            message_data = _dumps_record(message)
+            with self._batch():
+                execute = self._conn.execute
+                execute(self._SQL_UPSERT_SESSION, (session.session_id, session_data))
+                execute(self._SQL_UPSERT_AGENT, (session.session_id, agent.agent_id, agent_data))
+                execute(
+                    self._SQL_UPSERT_MESSAGE, (session.session_id, agent.agent_id, message.message_id, message_data)
+                )
+                self._invalidate_history(session.session_id, agent.agent_id)
+                self._invalidate_records(session.session_id)
+        except Exception as e:
+            raise SessionException(f"Failed to save turn: {e}")
 
     def read_message(self, session_id: str, agent_id: str, message_id: int) -> SessionMessage:
         """Read a message from an agent."""
-        cursor = self._conn.execute(
-            "SELECT data FROM messages WHERE session_id = ? AND agent_id = ? AND message_id = ?",
-            (session_id, agent_id, message_id),
-        )
-        row = cursor.fetchone()
+        with self._reader() as conn:
+            row = conn.execute(self._SQL_SELECT_MESSAGE, (session_id, agent_id, message_id)).fetchone()
         if not row:
             raise SessionException(f"Message {message_id} not found")
 
         try:
-            return SessionMessage.from_dict(json.loads(row[0]))
+            return SessionMessage.from_dict(_loads(row[0]))
         except Exception as e:
             raise SessionException(f"Failed to read message: {e}")
 
     def update_message(self, session_id: str, agent_id: str, message: SessionMessage) -> None:
         """Update a message in an agent."""
-        cursor = self._conn.execute(
-            "SELECT created_at FROM messages WHERE session_id = ? AND agent_id = ? AND message_id = ?",
-            (session_id, agent_id, message.message_id),
-        )
-        row = cursor.fetchone()
-        if not row:
-            raise SessionException(f"Message {message.message_id} not found")
-
         try:
-            data = json.dumps(message.to_dict())
-            self._conn.execute(
-                "UPDATE messages SET data = ?, updated_at = CURRENT_TIMESTAMP WHERE session_id = ? AND agent_id = ? AND message_id = ?",
-                (data, session_id, agent_id, message.message_id),
-            )
-            self._conn.commit()
+            data = _dumps_record(message)
+            with self._batch():
+                cursor = self._conn.execute(self._SQL_UPDATE_MESSAGE, (data, session_id, agent_id, message.message_id))
+                self._invalidate_history(session_id, agent_id)
         except Exception as e:
             raise SessionException(f"Failed to update message: {e}")
+        if cursor.rowcount == 0:
+            raise SessionException(f"Message {message.message_id} not found")
 
     def list_messages(
         self, session_id: str, agent_id: str, limit: int | None = None, offset: int = 0
     ) -> list[SessionMessage]:
         """List messages for an agent with pagination."""
-        query = """
-            SELECT data FROM messages 
-            WHERE session_id = ? AND agent_id = ? 
-            ORDER BY message_id
-        """
-        params = [session_id, agent_id]
+        cached = None
+        # Rows read inside a batch may still be rolled back, so they never populate the cache.
+        if self._cache_reads and not self._batch_depth:
+            key = (self._cache_key, session_id, agent_id)
+            cached = _history_cache.get(key)
+            if cached is None and limit is None:
+                generation = _history_cache.generation
+                cached = list(self._query_messages(session_id, agent_id))
+                _history_cache.put(key, cached, generation)
 
-        if limit is not None:
-            query += " LIMIT ? OFFSET ?"
-            params.extend([limit, offset])
+        payloads: Iterable[_MessagePayload]
+        if cached is not None:
+            payloads = cached[offset:] if limit is None else cached[offset : offset + limit]
+        else:
+            payloads = self._query_messages(session_id, agent_id, limit, offset)
+
+        decode = self._decode_message
+        return [decode(message_id, payload) for message_id, payload in payloads]
+
+    def iter_messages(
+        self, session_id: str, agent_id: str, limit: int | None = None, offset: int = 0
+    ) -> Iterator[SessionMessage]:
+        """Yield messages for an agent one at a time, so callers can bound memory on very long histories.
 
-        cursor = self._conn.execute(query, params)
+        Bypasses the history cache. Rows are fetched a batch at a time, each batch on a read connection that is
+        returned before anything is yielded, so a paused iterator holds no connection or lock. Batches after the
+        first resume after the last message_id seen, so they reflect writes committed in between.
+        """
+        remaining = limit
+        last_id: int | None = None
+        while True:
+            size = _FETCH_BATCH_SIZE if remaining is None else min(_FETCH_BATCH_SIZE, remaining)
+            if size <= 0:
+                return
+            with self._reader() as conn:
+                if last_id is None:
+                    rows = conn.execute(self._SQL_LIST_MESSAGES_PAGE, (session_id, agent_id, size, offset)).fetchall()
+                else:
+                    rows = conn.execute(self._SQL_LIST_MESSAGES_AFTER, (session_id, agent_id, last_id, size)).fetchall()
+            for message_id, payload in rows:
+                yield self._decode_message(message_id, payload)
+            if len(rows) < size:
+                return
+            last_id = rows[-1][0]
+            if remaining is not None:
+                remaining -= len(rows)
 
+    @staticmethod
+    def _decode_message(message_id: int, payload: bytes | str) -> SessionMessage:
+        """Decode one stored message, naming its message_id if the payload is corrupt."""
         try:
-            return [SessionMessage.from_dict(json.loads(row[0])) for row in cursor.fetchall()]
+            return _message_from_dict(_loads(payload))
         except Exception as e:
-            raise SessionException(f"Failed to list messages: {e}")
+            raise SessionException(f"Failed to list messages: message {message_id}: {e}")
+
+    def _query_messages(
+        self, session_id: str, agent_id: str, limit: int | None = None, offset: int = 0
+    ) -> Iterator[_MessagePayload]:
+        """Stream stored (message_id, payload) rows for an agent in message order, a batch of rows at a time."""
+        with self._reader() as conn:
+            if limit is None:
+                cursor = conn.execute(self._SQL_LIST_MESSAGES, (session_id, agent_id))
+            else:
+                cursor = conn.execute(self._SQL_LIST_MESSAGES_PAGE, (session_id, agent_id, limit, offset))
+            cursor.arraysize = _FETCH_BATCH_SIZE
+            while rows := cursor.fetchmany():
+                yield from rows
 
     def create_multi_agent(self, session_id: str, multi_agent_id: str, state: dict[str, Any]) -> None:
         """Create multi-agent state."""
         try:
-            data = json.dumps(state)
-            self._conn.execute(
-                "INSERT INTO multi_agents (session_id, multi_agent_id, data) VALUES (?, ?, ?)",
-                (session_id, multi_agent_id, data),
-            )
-            self._conn.commit()
-        except sqlite3.IntegrityError as e:
-            if "FOREIGN KEY" in str(e):
-                raise SessionException(f"Session {session_id} not found")
+            data = _dumps(state)
+            with self._batch():
+                cursor = self._conn.execute(self._SQL_INSERT_MULTI_AGENT, (session_id, multi_agent_id, data))
+        except sqlite3.IntegrityError:
             raise SessionException(f"Multi-agent {multi_agent_id} already exists")
         except Exception as e:
             raise SessionException(f"Failed to create multi-agent: {e}")
+        if cursor.rowcount == 0:
+            raise SessionException(f"Session {session_id} not found")
 
     def read_multi_agent(self, session_id: str, multi_agent_id: str) -> dict[str, Any]:
         """Read multi-agent state."""
-        cursor = self._conn.execute(
-            "SELECT data FROM multi_agents WHERE session_id = ? AND multi_agent_id = ?",
-            (session_id, multi_agent_id),
-        )
-        row = cursor.fetchone()
+        with self._reader() as conn:
+            row = conn.execute(self._SQL_SELECT_MULTI_AGENT, (session_id, multi_agent_id)).fetchone()
         if not row:
             raise SessionException(f"Multi-agent {multi_agent_id} not found")
 
         try:
-            return json.loads(row[0])
+            return _loads(row[0])
         except Exception as e:
             raise SessionException(f"Failed to read multi-agent: {e}")
 
     def update_multi_agent(self, session_id: str, multi_agent_id: str, state: dict[str, Any]) -> None:
         """Update multi-agent state."""
-        cursor = self._conn.execute(
-            "SELECT created_at FROM multi_agents WHERE session_id = ? AND multi_agent_id = ?",
-            (session_id, multi_agent_id),
-        )
-        row = cursor.fetchone()
-        if not row:
-            raise SessionException(f"Multi-agent {multi_agent_id} not found")
-
         try:
-            data = json.dumps(state)
-            self._conn.execute(
-                "UPDATE multi_agents SET data = ?, updated_at = CURRENT_TIMESTAMP WHERE session_id = ? AND multi_agent_id = ?",
-                (data, session_id, multi_agent_id),
-            )
-            self._conn.commit()
+            data = _dumps(state)
+            with self._batch():
+                cursor = self._conn.execute(self._SQL_UPDATE_MULTI_AGENT, (data, session_id, multi_agent_id))
         except Exception as e:
             raise SessionException(f"Failed to update multi-agent: {e}")
+        if cursor.rowcount == 0:
+            raise SessionException(f"Multi-agent {multi_agent_id} not found")
+
+    def backup_to(
+        self,
+        path: str,
+        pages: int = 1024,
+        progress: Callable[[int, int, int], object] | None = None,
+    ) -> None:
+        """Copy the live database to path with SQLite's online backup API.
+
+        Pages are streamed in steps of ``pages`` so concurrent readers and writers are not blocked for the
+        whole copy, and the copy is consistent even while the WAL holds uncheckpointed data.
+
+        Restoring by backing up over another database file is only safe while no manager in this process has that
+        file open; close them (or call shutdown()) first. Cached history for the destination is dropped.
+
+        Args:
+            path: Destination database file; created or overwritten
+            pages: Number of pages copied per step
+            progress: Optional callback invoked as progress(status, remaining, total) after each step
+        """
+        _ensure_parent_dir(path)
+        dst = sqlite3.connect(path)
+        try:
+            # A pooled reader keeps in-process writes flowing between steps; only :memory: has to use the writer.
+            with self._reader() as conn:
+                conn.backup(dst, pages=pages, progress=progress)
+        except sqlite3.Error as e:
+            raise SessionException(f"Failed to back up database: {e}")
+        finally:
+            dst.close()
+            _history_cache.invalidate_database(os.path.realpath(path))
+            _record_cache.invalidate_database(os.path.realpath(path))
+
+    def close(self) -> None:
+        """Release this manager's connections. Safe to call more than once.
+
+        Connections are shared by every manager open on the same database; the last manager to close runs
+        PRAGMA optimize and closes them.
+        """
+        connections, self._connections = self._connections, None
+        if connections is None:
+            return
+        self._conn = None
+        with _open_connections_lock:
+            connections.refs -= 1
+            if connections.refs:
+                return
+            if _open_connections.get(self._connections_key) is connections:
+                del _open_connections[self._connections_key]
+        connections.close(optimize=self._db_path != ":memory:")
+
+    @classmethod
+    def shutdown(cls) -> None:
+        """Close every connection the process holds open, e.g. at interpreter exit.
+
+        Managers still using them fail on their next call, so only call this once no manager is in use.
+        """
+        with _open_connections_lock:
+            connections = list(_open_connections.values())
+            _open_connections.clear()
+        for shared in connections:
+            shared.close(optimize=True)
+
+    def __enter__(self) -> "SQLiteSessionManager":
+        return self
+
+    def __exit__(self, *exc_info: object) -> None:
+        self.close()
 
     def __del__(self) -> None:
-        """Close database connection on cleanup."""
-        if self._conn:
-            self._conn.close()
+        """Last-resort cleanup for managers that were never closed."""
+        try:
+            self.close()
+        except Exception:
+            # Finalizers can run at interpreter shutdown, or on a half-constructed manager.
+            pass
@@ -1,16 +1,21 @@
 """Tests for SQLiteSessionManager."""
 
+import json
+import sqlite3
+
 import pytest
 from strands.types.exceptions import SessionException
 from strands.types.session import Session, SessionAgent, SessionMessage
 
-from strands_sqlite_session_manager import SQLiteSessionManager
+from strands_sqlite_session_manager import MessageRow, SQLiteSessionManager
 
 
 @pytest.fixture
 def manager():
     """Create in-memory session manager for testing."""
-    return SQLiteSessionManager(session_id="test-session", db_path=":memory:")
+    manager = SQLiteSessionManager(session_id="test-session", db_path=":memory:")
+    yield manager
+    manager.close()
 
 
 @pytest.fixture
@@ -62,6 +67,20 @@ class TestSessionOperations:
         with pytest.raises(SessionException, match="not found"):
             manager.delete_session("nonexistent")
 
+    def test_delete_session_removes_children_in_one_commit(self, manager, agent, message):
+        manager.create_agent(manager.session_id, agent)
+        manager.create_message(manager.session_id, agent.agent_id, message)
+        manager.create_multi_agent(manager.session_id, "multi-1", {})
+
+        changes = manager._conn.total_changes
+        manager.delete_session(manager.session_id)
+
+        # session, agent, message and multi-agent rows: one DELETE, cascaded by SQLite
+        assert manager._conn.total_changes - changes == 4
+        assert not manager._conn.in_transaction
+        for table in ("agents", "messages", "multi_agents"):
+            assert manager._conn.execute(f"SELECT COUNT(*) FROM {table}").fetchone()[0] == 0
+
 
 class TestAgentOperations:
     """Test agent CRUD operations."""
@@ -179,6 +198,202 @@ class TestMessageOperations:
         assert messages[0].message_id == 2
         assert messages[2].message_id == 4
 
+    def test_list_messages_is_index_ordered(self, manager):
+        plan = manager._conn.execute(f"EXPLAIN QUERY PLAN {manager._SQL_LIST_MESSAGES}", ("s", "a")).fetchall()
+        details = " ".join(row[-1] for row in plan)
+        assert "USING INDEX" in details or "USING PRIMARY KEY" in details
+        assert "TEMP B-TREE" not in details
+
+    def test_schema_has_no_redundant_indexes(self, manager):
+        schema = dict(manager._conn.execute("SELECT name, sql FROM sqlite_master WHERE sql IS NOT NULL").fetchall())
+
+        assert sorted(schema) == ["agents", "messages", "multi_agents", "sessions"]
+        for table in ("agents", "messages", "multi_agents"):
+            assert schema[table].rstrip().endswith("WITHOUT ROWID")
+
+    def test_iter_messages(self, manager, agent):
+        from strands.types.content import Message
+
+        manager.create_agent(manager.session_id, agent)
+        manager.create_messages(
+            manager.session_id,
+            agent.agent_id,
+            [SessionMessage(message_id=i, message=Message(role="user", content=[{"text": f"{i}"}])) for i in range(5)],
+        )
+
+        iterator = manager.iter_messages(manager.session_id, agent.agent_id, limit=2, offset=1)
+        assert not isinstance(iterator, list)
+        assert [m.message_id for m in iterator] == [1, 2]
+
+    def test_paused_iter_messages_holds_no_lock(self, manager, agent, message, monkeypatch):
+        import threading
+
+        from strands.types.content import Message
+
+        from strands_sqlite_session_manager import manager as manager_module
+
+        monkeypatch.setattr(manager_module, "_FETCH_BATCH_SIZE", 2)
+        manager.create_agent(manager.session_id, agent)
+        manager.create_messages(
+            manager.session_id,
+            agent.agent_id,
+            [SessionMessage(message_id=i, message=Message(role="user", content=[{"text": f"{i}"}])) for i in range(5)],
+        )
+
+        iterator = manager.iter_messages(manager.session_id, agent.agent_id)
+        assert next(iterator).message_id == 0
+        # :memory: reads share the writer, so a held read would block this write
+        writer = threading.Thread(
+            target=manager.create_message,
+            args=(manager.session_id, agent.agent_id, SessionMessage(message_id=9, message=message.message)),
+        )
+        writer.start()
+        writer.join(1.0)
+        assert not writer.is_alive()
+        assert [m.message_id for m in iterator] == [1, 2, 3, 4, 9]
+
+    def test_list_messages_reports_corrupt_message_id(self, manager, agent):
+        manager.create_agent(manager.session_id, agent)
+        manager._conn.execute(
+            "INSERT INTO messages (session_id, agent_id, message_id, data) VALUES (?, ?, ?, ?)",
+            (manager.session_id, agent.agent_id, 7, "{not json"),
+        )
+        manager._conn.commit()
+
+        with pytest.raises(SessionException, match="message 7"):
+            manager.list_messages(manager.session_id, agent.agent_id)
+
+
+class TestBatchWrites:
+    """Test batched message writes."""
+
+    def test_create_messages(self, manager, agent):
+        from strands.types.content import Message
+
+        manager.create_agent(manager.session_id, agent)
+        messages = [
+            SessionMessage(message_id=i, message=Message(role="user", content=[{"text": f"Message {i}"}]))
+            for i in range(5)
+        ]
+        manager.create_messages(manager.session_id, agent.agent_id, messages)
+
+        assert not manager._conn.in_transaction
+        listed = manager.list_messages(manager.session_id, agent.agent_id)
+        assert [m.message_id for m in listed] == [0, 1, 2, 3, 4]
+
+    def test_save_turn(self, manager, session, agent, message):
+        from strands.types.content import Message
+
+        session = Session(session_id="turn-session", session_type=session.session_type)
+        changes = manager._conn.total_changes
+        manager.save_turn(session, agent, message)
+
+        assert manager._conn.total_changes - changes == 3
+        assert not manager._conn.in_transaction
+        assert manager.read_session("turn-session") is not None
+        assert manager.read_agent("turn-session", agent.agent_id).agent_id == agent.agent_id
+        assert len(manager.list_messages("turn-session", agent.agent_id)) == 1
+
+        # Replaying the turn overwrites its rows
+        agent.state = {"turns": 2}
+        message.message = Message(role="user", content=[{"text": "Replayed"}])
+        manager.save_turn(session, agent, message)
+
+        assert manager.read_agent("turn-session", agent.agent_id).state == {"turns": 2}
+        listed = manager.list_messages("turn-session", agent.agent_id)
+        assert [m.message["content"][0]["text"] for m in listed] == ["Replayed"]
+
+    def test_create_messages_rolls_back_on_duplicate(self, manager, agent, message):
+        manager.create_agent(manager.session_id, agent)
+        manager.create_message(manager.session_id, agent.agent_id, message)
+        new_message = SessionMessage(message_id=message.message_id + 1, message=message.message)
+
+        with pytest.raises(SessionException, match="already exists"):
+            manager.create_messages(manager.session_id, agent.agent_id, [new_message, message])
+
+        assert len(manager.list_messages(manager.session_id, agent.agent_id)) == 1
+
+    def test_create_messages_unknown_agent(self, manager, message):
+        with pytest.raises(SessionException, match="Agent nonexistent not found"):
+            manager.create_messages(manager.session_id, "nonexistent", [message])
+
+    def test_append_many_across_agents(self, manager, message):
+        for agent_id in ("agent-1", "agent-2"):
+            manager.create_agent(
+                manager.session_id, SessionAgent(agent_id=agent_id, state={}, conversation_manager_state={})
+            )
+
+        manager.append_many(
+            [
+                MessageRow(manager.session_id, "agent-1", message),
+                MessageRow(manager.session_id, "agent-2", message),
+            ]
+        )
+
+        assert len(manager.list_messages(manager.session_id, "agent-1")) == 1
+        assert len(manager.list_messages(manager.session_id, "agent-2")) == 1
+
+    def test_append_many_unknown_agent(self, manager, message):
+        with pytest.raises(SessionException, match="not found"):
+            manager.append_many([MessageRow(manager.session_id, "nonexistent", message)])
+
+    def test_append_many_partially_unknown_rolls_back(self, manager, agent, message):
+        manager.create_agent(manager.session_id, agent)
+
+        with pytest.raises(SessionException, match="not found"):
+            manager.append_many(
+                [
+                    MessageRow(manager.session_id, agent.agent_id, message),
+                    MessageRow(manager.session_id, "nonexistent", message),
+                ]
+            )
+
+        assert manager.list_messages(manager.session_id, agent.agent_id) == []
+
+    def test_transaction_commits_on_exit(self, tmp_path, agent, message):
+        from concurrent.futures import ThreadPoolExecutor
+
+        db_path = str(tmp_path / "sessions.db")
+        with (
+            SQLiteSessionManager(session_id="test-session", db_path=db_path, cache_reads=False) as writer,
+            SQLiteSessionManager(session_id="test-session", db_path=db_path, cache_reads=False) as other,
+        ):
+            with writer.transaction():
+                writer.create_agent(writer.session_id, agent)
+                writer.create_message(writer.session_id, agent.agent_id, message)
+                assert writer._conn.in_transaction
+                # Managers share connections, so isolation is per thread: another thread reads the committed state
+                with ThreadPoolExecutor(max_workers=1) as pool:
+                    assert pool.submit(other.read_agent, other.session_id, agent.agent_id).result() is None
+
+            assert not writer._conn.in_transaction
+            assert len(other.list_messages(other.session_id, agent.agent_id)) == 1
+
+    def test_transaction_rolls_back_on_error(self, manager, agent, message):
+        with pytest.raises(RuntimeError):
+            with manager.transaction():
+                manager.create_agent(manager.session_id, agent)
+                with manager.transaction():
+                    manager.create_message(manager.session_id, agent.agent_id, message)
+                raise RuntimeError("boom")
+
+        assert manager.read_agent(manager.session_id, agent.agent_id) is None
+
+    def test_writes_from_other_threads_wait_for_open_transaction(self, manager, agent, message):
+        import threading
+
+        manager.create_agent(manager.session_id, agent)
+        writer = threading.Thread(target=manager.create_message, args=(manager.session_id, agent.agent_id, message))
+        with pytest.raises(RuntimeError):
+            with manager.transaction():
+                writer.start()
+                writer.join(0.2)
+                assert writer.is_alive()
+                raise RuntimeError("boom")
+        writer.join()
+
+        assert len(manager.list_messages(manager.session_id, agent.agent_id)) == 1
+
 
 class TestMultiAgentOperations:
     """Test multi-agent state operations."""
@@ -215,3 +430,512 @@ class TestMultiAgentOperations:
         manager.create_session(session)
         with pytest.raises(SessionException, match="not found"):
             manager.update_multi_agent(session.session_id, "nonexistent", {})
+
+
+class TestConnectionSettings:
+    """Test per-connection pragma configuration."""
+
+    def test_close_releases_wal_files(self, tmp_path):
+        db_path = tmp_path / "sessions.db"
+        with SQLiteSessionManager(session_id="test-session", db_path=str(db_path)) as manager:
+            assert (tmp_path / "sessions.db-wal").exists()
+
+        assert manager._conn is None
+        assert not (tmp_path / "sessions.db-wal").exists()
+        manager.close()
+
+    def test_reads_after_close_raise(self, tmp_path):
+        manager = SQLiteSessionManager(session_id="test-session", db_path=str(tmp_path / "sessions.db"))
+        manager.close()
+        with pytest.raises(SessionException, match="closed"):
+            manager.read_session("test-session")
+
+    def test_close_closes_checked_out_readers(self, tmp_path):
+        manager = SQLiteSessionManager(session_id="test-session", db_path=str(tmp_path / "sessions.db"))
+        with manager._reader() as conn:
+            manager.close()
+        with pytest.raises(sqlite3.ProgrammingError):
+            conn.execute("SELECT 1")
+
+    def test_file_database_uses_wal(self, tmp_path):
+        with SQLiteSessionManager(session_id="test-session", db_path=str(tmp_path / "sessions.db")) as manager:
+            assert manager._conn.execute("PRAGMA journal_mode").fetchone()[0] == "wal"
+            # synchronous=NORMAL is reported as 1
+            assert manager._conn.execute("PRAGMA synchronous").fetchone()[0] == 1
+            assert manager._conn.execute("PRAGMA busy_timeout").fetchone()[0] == 5000
+
+    def test_wal2_falls_back_to_wal(self, tmp_path):
+        # Builds without wal2 leave the journal mode unchanged instead of failing.
+        probe = sqlite3.connect(tmp_path / "probe.db")
+        supported = probe.execute("PRAGMA journal_mode=wal2").fetchone()[0] == "wal2"
+        probe.close()
+
+        with SQLiteSessionManager(
+            session_id="test-session", db_path=str(tmp_path / "sessions.db"), journal_mode="wal2"
+        ) as manager:
+            expected = "wal2" if supported else "wal"
+            assert manager._conn.execute("PRAGMA journal_mode").fetchone()[0] == expected
+
+    def test_schema_bootstrap_records_user_version(self, tmp_path):
+        db_path = str(tmp_path / "sessions.db")
+        with SQLiteSessionManager(session_id="test-session", db_path=db_path) as manager:
+            version = manager._conn.execute("PRAGMA user_version").fetchone()[0]
+            assert version > 0
+            assert not manager._conn.in_transaction
+
+        with SQLiteSessionManager(session_id="test-session", db_path=db_path) as manager:
+            assert manager._conn.execute("PRAGMA user_version").fetchone()[0] == version
+            assert manager.read_session("test-session") is not None
+
+    def test_schema_recreated_after_database_is_deleted(self, tmp_path):
+        db_path = tmp_path / "sessions.db"
+        SQLiteSessionManager(session_id="test-session", db_path=str(db_path)).close()
+        for path in tmp_path.glob("sessions.db*"):
+            path.unlink()
+
+        with SQLiteSessionManager(session_id="test-session", db_path=str(db_path)) as manager:
+            assert manager.read_session("test-session") is not None
+
+    def test_managers_share_connections_per_database(self, tmp_path):
+        db_path = str(tmp_path / "sessions.db")
+        with SQLiteSessionManager(session_id="second", db_path=db_path) as second:
+            with SQLiteSessionManager(session_id="first", db_path=db_path) as first:
+                assert second._conn is first._conn
+                assert second._readers is first._readers
+                conn = first._conn
+
+            # Still open for the second manager
+            assert second.read_session("first") is not None
+        with pytest.raises(sqlite3.ProgrammingError):
+            conn.execute("SELECT 1")
+
+    def test_managers_with_different_settings_use_separate_connections(self, tmp_path):
+        db_path = str(tmp_path / "sessions.db")
+        with SQLiteSessionManager(session_id="test-session", db_path=db_path) as first:
+            with SQLiteSessionManager(session_id="test-session", db_path=db_path, pool_size=1) as second:
+                assert second._conn is not first._conn
+
+    def test_shutdown_closes_open_connections(self, tmp_path):
+        with SQLiteSessionManager(session_id="test-session", db_path=str(tmp_path / "sessions.db")) as manager:
+            conn = manager._conn
+            SQLiteSessionManager.shutdown()
+            with pytest.raises(sqlite3.ProgrammingError):
+                conn.execute("SELECT 1")
+
+    def test_invalid_journal_mode(self, tmp_path):
+        with pytest.raises(ValueError, match="journal_mode"):
+            SQLiteSessionManager(
+                session_id="test-session", db_path=str(tmp_path / "sessions.db"), journal_mode="delete"
+            )
+
+    def test_wal_autocheckpoint_is_configurable(self, tmp_path):
+        with SQLiteSessionManager(
+            session_id="test-session", db_path=str(tmp_path / "sessions.db"), wal_autocheckpoint=0
+        ) as manager:
+            assert manager._conn.execute("PRAGMA wal_autocheckpoint").fetchone()[0] == 0
+
+    def test_mmap_size_is_configurable(self, tmp_path):
+        with SQLiteSessionManager(
+            session_id="test-session", db_path=str(tmp_path / "sessions.db"), mmap_size=1024 * 1024
+        ) as manager:
+            assert manager._conn.execute("PRAGMA mmap_size").fetchone()[0] == 1024 * 1024
+
+    def test_reads_use_connection_pool(self, tmp_path, agent):
+        db_path = str(tmp_path / "sessions.db")
+        with SQLiteSessionManager(session_id="test-session", db_path=db_path, pool_size=2) as manager:
+            assert manager._readers.qsize() == 2
+
+            # Committed writes on the writer are visible to pooled readers
+            manager.create_agent(manager.session_id, agent)
+            assert manager.read_agent(manager.session_id, agent.agent_id).agent_id == agent.agent_id
+            agent.state = {"updated": "value"}
+            manager.update_agent(manager.session_id, agent)
+            assert manager.read_agent(manager.session_id, agent.agent_id).state == {"updated": "value"}
+            assert manager._readers.qsize() == 2
+
+    def test_pooled_readers_are_read_only(self, tmp_path):
+        with SQLiteSessionManager(session_id="test-session", db_path=str(tmp_path / "my sessions.db")) as manager:
+            with manager._reader() as conn:
+                assert conn.execute("SELECT COUNT(*) FROM sessions").fetchone()[0] == 1
+                with pytest.raises(sqlite3.OperationalError, match="readonly"):
+                    conn.execute("DELETE FROM sessions")
+                assert conn.execute("PRAGMA query_only").fetchone()[0] == 1
+
+    def test_periodic_optimize_thread(self, tmp_path):
+        manager = SQLiteSessionManager(
+            session_id="test-session", db_path=str(tmp_path / "sessions.db"), optimize_interval=0.01
+        )
+        assert not manager._optimize_stop.wait(0.05)
+        manager.__del__()
+        assert manager._optimize_stop.is_set()
+
+    def test_periodic_optimize_survives_chdir(self, tmp_path, monkeypatch):
+        import time
+
+        (tmp_path / "db").mkdir()
+        (tmp_path / "elsewhere").mkdir()
+        monkeypatch.chdir(tmp_path / "db")
+        with SQLiteSessionManager(session_id="test-session", db_path="sessions.db", optimize_interval=0.01):
+            monkeypatch.chdir(tmp_path / "elsewhere")
+            time.sleep(0.05)
+
+        assert not (tmp_path / "elsewhere" / "sessions.db").exists()
+
+    def test_temp_store_and_cache_size(self, tmp_path):
+        with SQLiteSessionManager(session_id="test-session", db_path=str(tmp_path / "sessions.db")) as manager:
+            # temp_store=MEMORY is reported as 2
+            assert manager._conn.execute("PRAGMA temp_store").fetchone()[0] == 2
+            assert manager._conn.execute("PRAGMA cache_size").fetchone()[0] == -65536
+
+    def test_cache_size_opt_out(self):
+        with SQLiteSessionManager(session_id="test-session", db_path=":memory:", cache_size=None) as manager:
+            assert manager._conn.execute("PRAGMA cache_size").fetchone()[0] == -2000
+
+    def test_shared_memory_database(self, agent):
+        first = SQLiteSessionManager(session_id="test-session", db_path=":memory:", shared_memory=True)
+        first.create_agent(first.session_id, agent)
+
+        second = SQLiteSessionManager(session_id="test-session", db_path=":memory:", shared_memory=True)
+        assert second.read_agent(second.session_id, agent.agent_id).agent_id == agent.agent_id
+
+        # The database outlives every manager that had it open
+        first.__del__()
+        second.__del__()
+        with SQLiteSessionManager(session_id="test-session", db_path=":memory:", shared_memory=True) as third:
+            assert third.read_agent(third.session_id, agent.agent_id).agent_id == agent.agent_id
+            third._conn.execute("DELETE FROM sessions")
+            third._conn.commit()
+
+    def test_creates_database_directory_once(self, tmp_path, monkeypatch):
+        import os
+
+        db_path = tmp_path / "nested" / "dir" / "sessions.db"
+        SQLiteSessionManager(session_id="test-session", db_path=str(db_path)).close()
+        assert db_path.exists()
+
+        def fail_makedirs(*args, **kwargs):
+            raise AssertionError("directory should already be known")
+
+        monkeypatch.setattr(os, "makedirs", fail_makedirs)
+        SQLiteSessionManager(session_id="test-session", db_path=str(db_path)).close()
+
+    def test_recreates_removed_database_directory(self, tmp_path):
+        import shutil
+
+        db_path = tmp_path / "nested" / "sessions.db"
+        SQLiteSessionManager(session_id="test-session", db_path=str(db_path)).close()
+        shutil.rmtree(tmp_path / "nested")
+
+        with SQLiteSessionManager(session_id="test-session", db_path=str(db_path)) as manager:
+            assert manager.read_session("test-session") is not None
+
+    def test_memory_database_skips_wal(self, manager):
+        assert manager._conn.execute("PRAGMA journal_mode").fetchone()[0] == "memory"
+
+
+class TestSingleStatementUpdates:
+    """Test that updates detect missing rows from the UPDATE itself."""
+
+    def test_update_missing_rows(self, manager, agent, message):
+        with pytest.raises(SessionException, match="not found"):
+            manager.update_agent(manager.session_id, agent)
+        manager.create_agent(manager.session_id, agent)
+        with pytest.raises(SessionException, match="not found"):
+            manager.update_message(manager.session_id, agent.agent_id, message)
+        with pytest.raises(SessionException, match="not found"):
+            manager.update_multi_agent(manager.session_id, "nonexistent", {})
+        assert not manager._conn.in_transaction
+
+    def test_updates_write_new_data(self, manager, agent, message):
+        from strands.types.content import Message
+
+        manager.create_agent(manager.session_id, agent)
+        manager.create_message(manager.session_id, agent.agent_id, message)
+        manager.create_multi_agent(manager.session_id, "multi-1", {"step": 1})
+
+        agent.state = {"updated": "value"}
+        manager.update_agent(manager.session_id, agent)
+        message.message = Message(role="user", content=[{"text": "Updated"}])
+        manager.update_message(manager.session_id, agent.agent_id, message)
+        manager.update_multi_agent(manager.session_id, "multi-1", {"step": 2})
+
+        assert manager.read_agent(manager.session_id, agent.agent_id).state == {"updated": "value"}
+        retrieved = manager.read_message(manager.session_id, agent.agent_id, message.message_id)
+        assert retrieved.message["content"][0]["text"] == "Updated"
+        assert manager.read_multi_agent(manager.session_id, "multi-1") == {"step": 2}
+
+
+class TestSerialization:
+    """Test JSON (de)serialization of stored payloads."""
+
+    def test_state_round_trip_matches_stdlib_json(self, manager):
+        state = {1: "int key", "big": 2**70, "nested": {"list": [1.5, None, True]}, "text": "héllo"}
+        manager.create_multi_agent(manager.session_id, "multi-1", state)
+
+        assert manager.read_multi_agent(manager.session_id, "multi-1") == {
+            "1": "int key",
+            "big": 2**70,
+            "nested": {"list": [1.5, None, True]},
+            "text": "héllo",
+        }
+
+    def test_non_finite_floats_round_trip(self, manager):
+        import math
+
+        manager.create_multi_agent(manager.session_id, "multi-1", {"nan": math.nan, "inf": math.inf, "none": None})
+
+        state = manager.read_multi_agent(manager.session_id, "multi-1")
+        assert math.isnan(state["nan"])
+        assert state["inf"] == math.inf
+        assert state["none"] is None
+
+    def test_reads_non_finite_floats_from_older_databases(self, manager):
+        manager._conn.execute(
+            "INSERT INTO multi_agents (session_id, multi_agent_id, data) VALUES (?, ?, ?)",
+            (manager.session_id, "multi-1", json.dumps({"value": float("-inf")})),
+        )
+        manager._conn.commit()
+
+        assert manager.read_multi_agent(manager.session_id, "multi-1") == {"value": float("-inf")}
+
+    def test_records_stored_as_their_to_dict(self, manager, agent):
+        from strands.types.content import Message
+
+        text = SessionMessage(message_id=1, message=Message(role="user", content=[{"text": "Hello"}]))
+        image = SessionMessage(
+            message_id=2,
+            message=Message(role="user", content=[{"image": {"format": "png", "source": {"bytes": b"\x89PNG"}}}]),
+        )
+        agent._internal_state = {"interrupt_state": {"activated": False}}
+        manager.create_agent(manager.session_id, agent)
+        manager.create_messages(manager.session_id, agent.agent_id, [text, image])
+
+        stored_agent = manager._conn.execute("SELECT data FROM agents").fetchone()[0]
+        assert json.loads(stored_agent) == json.loads(json.dumps(agent.to_dict()))
+        rows = manager._conn.execute("SELECT data FROM messages ORDER BY message_id").fetchall()
+        assert [json.loads(row[0]) for row in rows] == [json.loads(json.dumps(m.to_dict())) for m in (text, image)]
+        restored = manager.read_message(manager.session_id, agent.agent_id, 2)
+        assert restored.message["content"][0]["image"]["source"]["bytes"] == b"\x89PNG"
+
+    def test_payloads_stored_as_blobs(self, manager, agent):
+        manager.create_agent(manager.session_id, agent)
+
+        stored = manager._conn.execute("SELECT typeof(data) FROM agents").fetchone()[0]
+        assert stored == "blob"
+
+    def test_reads_text_payloads_from_older_databases(self, manager, agent):
+        manager._conn.execute(
+            "INSERT INTO agents (session_id, agent_id, data) VALUES (?, ?, ?)",
+            (manager.session_id, agent.agent_id, json.dumps(agent.to_dict())),
+        )
+        manager._conn.commit()
+
+        assert manager.read_agent(manager.session_id, agent.agent_id).agent_id == agent.agent_id
+
+    def test_non_ascii_payloads_round_trip_through_readers(self, tmp_path, session, agent):
+        from strands.types.content import Message
+
+        with SQLiteSessionManager(
+            session_id="test-session", db_path=str(tmp_path / "sessions.db"), cache_reads=False
+        ) as manager:
+            manager.create_agent(session.session_id, agent)
+            text = "héllo wörld ✓ 你好 🙂"
+            manager.create_message(
+                session.session_id,
+                agent.agent_id,
+                SessionMessage(message_id=1, message=Message(role="user", content=[{"text": text}])),
+            )
+            legacy = SessionMessage(message_id=2, message=Message(role="assistant", content=[{"text": text}]))
+            manager._conn.execute(
+                "INSERT INTO messages (session_id, agent_id, message_id, data) VALUES (?, ?, ?, ?)",
+                (session.session_id, agent.agent_id, 2, json.dumps(legacy.to_dict(), ensure_ascii=False)),
+            )
+            manager._conn.commit()
+
+            messages = manager.list_messages(session.session_id, agent.agent_id)
+            assert [m.message["content"][0]["text"] for m in messages] == [text, text]
+            assert manager.read_message(session.session_id, agent.agent_id, 2).message["content"][0]["text"] == text
+
+
+class TestBackup:
+    """Test online database backups."""
+
+    def test_backup_to(self, manager, agent, message, tmp_path):
+        manager.create_agent(manager.session_id, agent)
+        manager.create_message(manager.session_id, agent.agent_id, message)
+
+        backup_path = tmp_path / "backup" / "sessions.db"
+        manager.backup_to(str(backup_path))
+
+        with SQLiteSessionManager(session_id=manager.session_id, db_path=str(backup_path)) as restored:
+            assert restored.read_agent(manager.session_id, agent.agent_id).agent_id == agent.agent_id
+            assert restored.read_message(manager.session_id, agent.agent_id, message.message_id).message_id == 1
+
+    def test_backup_does_not_block_writes(self, tmp_path, agent, message):
+        import threading
+
+        with SQLiteSessionManager(session_id="test-session", db_path=str(tmp_path / "sessions.db")) as manager:
+            manager.create_agent(manager.session_id, agent)
+            written = []
+
+            def progress(status, remaining, total):
+                if written:
+                    return
+                writer = threading.Thread(
+                    target=lambda: written.append(manager.create_message(manager.session_id, agent.agent_id, message))
+                )
+                writer.start()
+                writer.join(1.0)
+                assert not writer.is_alive()
+
+            manager.backup_to(str(tmp_path / "backup.db"), pages=1, progress=progress)
+            assert written
+
+    def test_restore_drops_cached_history(self, manager, agent, message, tmp_path):
+        db_path = str(tmp_path / "sessions.db")
+        with SQLiteSessionManager(session_id=manager.session_id, db_path=db_path) as original:
+            original.create_agent(original.session_id, agent)
+            original.create_message(original.session_id, agent.agent_id, message)
+            assert len(original.list_messages(original.session_id, agent.agent_id)) == 1
+
+        # The backup source has the agent but no messages
+        manager.create_agent(manager.session_id, agent)
+        manager.backup_to(db_path)
+
+        with SQLiteSessionManager(session_id=manager.session_id, db_path=db_path) as restored:
+            assert restored.list_messages(restored.session_id, agent.agent_id) == []
+
+
+class TestHistoryCache:
+    """Test the in-process message history cache."""
+
+    def _add_agent_with_messages(self, manager, agent, count):
+        from strands.types.content import Message
+
+        manager.create_agent(manager.session_id, agent)
+        manager.create_messages(
+            manager.session_id,
+            agent.agent_id,
+            [
+                SessionMessage(message_id=i, message=Message(role="user", content=[{"text": f"{i}"}]))
+                for i in range(count)
+            ],
+        )
+
+    def test_history_shared_across_managers(self, tmp_path, agent):
+        db_path = str(tmp_path / "sessions.db")
+        with SQLiteSessionManager(session_id="test-session", db_path=db_path) as first:
+            self._add_agent_with_messages(first, agent, 3)
+            assert len(first.list_messages(first.session_id, agent.agent_id)) == 3
+
+            # Remove the rows behind the cache's back: a second manager is served from memory
+            first._conn.execute("DELETE FROM messages")
+            first._conn.commit()
+
+        with SQLiteSessionManager(session_id="test-session", db_path=db_path) as second:
+            assert len(second.list_messages(second.session_id, agent.agent_id)) == 3
+            page = second.list_messages(second.session_id, agent.agent_id, limit=1, offset=1)
+            assert [m.message_id for m in page] == [1]
+
+    def test_history_invalidated_on_write(self, manager, agent, message):
+        self._add_agent_with_messages(manager, agent, 1)
+        assert len(manager.list_messages(manager.session_id, agent.agent_id)) == 1
+
+        manager.create_message(
+            manager.session_id, agent.agent_id, SessionMessage(message_id=5, message=message.message)
+        )
+        assert len(manager.list_messages(manager.session_id, agent.agent_id)) == 2
+
+    def test_history_not_cached_from_rolled_back_batch(self, manager, agent, message):
+        self._add_agent_with_messages(manager, agent, 1)
+        with pytest.raises(RuntimeError):
+            with manager._batch():
+                manager.create_message(manager.session_id, agent.agent_id, message)
+                assert len(manager.list_messages(manager.session_id, agent.agent_id)) == 2
+                raise RuntimeError("abort")
+
+        assert len(manager.list_messages(manager.session_id, agent.agent_id)) == 1
+
+    def test_uncached_history_spans_fetch_batches(self, tmp_path, agent):
+        with SQLiteSessionManager(
+            session_id="test-session", db_path=str(tmp_path / "sessions.db"), cache_reads=False
+        ) as manager:
+            self._add_agent_with_messages(manager, agent, 1200)
+
+            messages = manager.list_messages(manager.session_id, agent.agent_id)
+            assert [m.message_id for m in messages] == list(range(1200))
+            page = manager.list_messages(manager.session_id, agent.agent_id, limit=600, offset=500)
+            assert [m.message_id for m in page] == list(range(500, 1100))
+
+    def test_cache_reads_disabled(self, tmp_path, agent):
+        with SQLiteSessionManager(
+            session_id="test-session", db_path=str(tmp_path / "sessions.db"), cache_reads=False
+        ) as manager:
+            self._add_agent_with_messages(manager, agent, 2)
+            assert len(manager.list_messages(manager.session_id, agent.agent_id)) == 2
+
+            manager._conn.execute("DELETE FROM messages")
+            manager._conn.commit()
+            assert manager.list_messages(manager.session_id, agent.agent_id) == []
+
+
+class TestRecordCache:
+    """Test the in-process session and agent row cache."""
+
+    def test_reads_served_from_cache(self, manager, agent):
+        manager.create_agent(manager.session_id, agent)
+        assert manager.read_session(manager.session_id) is not None
+        assert manager.read_agent(manager.session_id, agent.agent_id) is not None
+
+        # Remove the rows behind the cache's back
+        manager._conn.execute("PRAGMA foreign_keys=OFF")
+        manager._conn.execute("DELETE FROM agents")
+        manager._conn.execute("DELETE FROM sessions")
+        manager._conn.commit()
+        manager._conn.execute("PRAGMA foreign_keys=ON")
+
+        assert manager.read_session(manager.session_id).session_id == manager.session_id
+        assert manager.read_agent(manager.session_id, agent.agent_id).agent_id == agent.agent_id
+
+    def test_agent_invalidated_on_update(self, manager, agent):
+        manager.create_agent(manager.session_id, agent)
+        assert manager.read_agent(manager.session_id, agent.agent_id).state == {}
+
+        agent.state = {"updated": "value"}
+        manager.update_agent(manager.session_id, agent)
+        assert manager.read_agent(manager.session_id, agent.agent_id).state == {"updated": "value"}
+
+    def test_session_invalidated_on_delete_and_save_turn(self, manager, session, agent, message):
+        manager.create_agent(manager.session_id, agent)
+        assert manager.read_agent(manager.session_id, agent.agent_id) is not None
+
+        manager.delete_session(manager.session_id)
+        assert manager.read_session(manager.session_id) is None
+        assert manager.read_agent(manager.session_id, agent.agent_id) is None
+
+        agent.state = {"turns": 1}
+        manager.save_turn(session, agent, message)
+        assert manager.read_session(session.session_id) is not None
+        assert manager.read_agent(session.session_id, agent.agent_id).state == {"turns": 1}
+
+    def test_rolled_back_update_not_cached(self, manager, agent):
+        manager.create_agent(manager.session_id, agent)
+        with pytest.raises(RuntimeError):
+            with manager.transaction():
+                agent.state = {"updated": "value"}
+                manager.update_agent(manager.session_id, agent)
+                assert manager.read_agent(manager.session_id, agent.agent_id).state == {"updated": "value"}
+                raise RuntimeError("abort")
+
+        assert manager.read_agent(manager.session_id, agent.agent_id).state == {}
+
+    def test_cache_reads_disabled(self, tmp_path, agent):
+        with SQLiteSessionManager(
+            session_id="test-session", db_path=str(tmp_path / "sessions.db"), cache_reads=False
+        ) as manager:
+            manager.create_agent(manager.session_id, agent)
+            assert manager.read_agent(manager.session_id, agent.agent_id) is not None
+
+            manager._conn.execute("DELETE FROM agents")
+            manager._conn.commit()
+            assert manager.read_agent(manager.session_id, agent.agent_id) is None